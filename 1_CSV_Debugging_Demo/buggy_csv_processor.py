@@ -4,14 +4,26 @@
 # It attempts to read sales data, calculate a total for each order, and save the result.
 #
 # Flaws include:
-# 1. Inefficient Looping: Uses df.iterrows(), which is very slow for large datasets.
-# 2. No Error Handling: Will crash if data types are incorrect (e.g., price is not a number).
+# 1. Silent Data Corruption: Unparseable values are coerced to NaN without being reported.
+# 2. No Error Handling: Missing or invalid data flows straight into the output.
 # 3. No Input Validation: Doesn't check for logical errors like negative quantities.
-# 4. Unsafe File Handling: Doesn't specify column structure, leading to index errors on malformed rows.
+# 4. Unsafe File Handling: Opens the output before validating the input, so a failure part-way leaves a truncated file.
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import time
 
+# The file is streamed in chunks of this many rows to keep memory use flat.
+CHUNK_SIZE = 200_000
+
+# Column layout of the output file, written with pyarrow's fast C++ CSV writer.
+OUTPUT_SCHEMA = pa.schema([
+    ('order_id', pa.int32()),
+    ('product_name', pa.string()),
+    ('total_price', pa.float64()),
+])
+
 def process_buggy_csv(input_file, output_file):
     """
     Reads a CSV, calculates total price for each row, and saves a new CSV.
@@ -20,35 +32,29 @@ def process_buggy_csv(input_file, output_file):
     print("--- Running Buggy CSV Processor ---")
     start_time = time.time()
 
-    # Reading the CSV without handling potential errors.
-    df = pd.read_csv(input_file)
-    
-    # This list will store the results.
-    processed_data = []
+    # Open the output before the input has been validated, and read without handling potential errors.
+    # If anything fails part-way through, a truncated output file is left behind.
+    with pacsv.CSVWriter(output_file, OUTPUT_SCHEMA) as writer:
+        reader = pd.read_csv(
+            input_file,
+            usecols=['order_id', 'product_name', 'quantity', 'price'],
+            dtype={'order_id': 'Int32', 'product_name': 'category', 'quantity': 'string', 'price': 'string'},
+            chunksize=CHUNK_SIZE,
+        )
+        for df in reader:
+            # Strip the '$' symbol and convert 'price' to a number in one vectorized pass.
+            # errors='coerce' silently turns anything unparseable into NaN, so bad rows
+            # are never reported and quietly corrupt the totals.
+            df['price'] = pd.to_numeric(df['price'].astype(str).str.replace('$', '', regex=False).str.strip(), errors='coerce')
 
-    # Inefficiently loop through each row. This is a major performance bottleneck.
-    for index, row in df.iterrows():
-        # This will raise a ValueError if 'price' isn't a clean number.
-        price = float(row['price'])
-        
-        # This will work, but it doesn't check if the quantity makes sense (e.g., > 0).
-        quantity = int(row['quantity'])
-        
-        # Calculate the total for the order.
-        total = price * quantity
-        
-        # Append the result to our list.
-        processed_data.append({
-            'order_id': row['order_id'],
-            'product_name': row['product_name'],
-            'total_price': total
-        })
+            # The same silent coercion for 'quantity', and nothing checks if it makes sense (e.g., > 0).
+            df['quantity'] = pd.to_numeric(df['quantity'], errors='coerce')
 
-    # Convert the list of dictionaries to a new DataFrame.
-    processed_df = pd.DataFrame(processed_data)
-    
-    # Save the result to a new CSV.
-    processed_df.to_csv(output_file, index=False)
+            # Calculate the total for every order in the chunk at once.
+            df['total_price'] = df['price'] * df['quantity']
+
+            # Append the chunk to the output CSV; the writer emits the header only once.
+            writer.write_table(pa.Table.from_pandas(df, schema=OUTPUT_SCHEMA, preserve_index=False))
     
     end_time = time.time()
     print(f"[*] Buggy script finished in {end_time - start_time:.4f} seconds.")
@@ -56,8 +62,7 @@ def process_buggy_csv(input_file, output_file):
 
 
 if __name__ == "__main__":
-    # This script will crash on the sample data.
-    # A client would see an error and not know why.
+    # See README.md: on the sample data this runs without complaint but writes incorrect totals.
     try:
         process_buggy_csv('sample_sales_data.csv', 'buggy_output.csv')
     except Exception as e:
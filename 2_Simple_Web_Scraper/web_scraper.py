@@ -8,16 +8,24 @@
 #
 # This script demonstrates:
 # - Making HTTP requests to a web server.
-# - Parsing HTML content with BeautifulSoup.
+# - Parsing HTML content with selectolax, a fast C-based HTML parser.
 # - Handling pagination to scrape multiple pages.
-# - Storing extracted data into a CSV file using pandas.
+# - Fetching pages concurrently with a shared, rate-limited session.
+# - Caching HTTP responses locally so repeat runs skip unchanged pages.
+# - Storing extracted data into a CSV file using pyarrow.
 # - Implementing cybersecurity and ethical scraping best practices.
 
 import requests
-import pandas as pd
-from bs4 import BeautifulSoup
-import time
+import requests_cache
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from selectolax.lexbor import LexborHTMLParser
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import logging
+import sys
 
 # --- Configuration ---
 
@@ -40,106 +48,243 @@ HEADERS = {
 # A 1-second delay is a reasonable starting point.
 REQUEST_DELAY_SECONDS = 1
 
+# Performance: Concurrent Fetching.
+# Page downloads are dominated by network latency, so a small pool of worker threads
+# overlaps the waiting. The rate limiter below still caps how fast requests are sent.
+MAX_WORKERS = 4
+
+# Performance & Ethics: HTTP Response Caching.
+# Pages are cached in a local SQLite file ('books_cache.sqlite'). Repeat runs within the
+# expiry window are served from disk without contacting the server at all, and expired
+# pages are revalidated with conditional requests (ETag / Last-Modified) where possible.
+# Revalidation still reaches the server, so those requests count against the rate limit.
+CACHE_NAME = 'books_cache'
+CACHE_EXPIRE_SECONDS = 3600
+
+# Worker threads report progress through this logger rather than print().
+# Each log record is written under the handler's lock, so lines from different threads never interleave.
+logger = logging.getLogger(__name__)
+
 # --- Main Application Logic ---
 
+def create_session():
+    """
+    Creates a cached requests session shared by all worker threads.
+    Reusing one session keeps TCP connections alive between requests
+    instead of opening a new connection for every page.
+    """
+    session = requests_cache.CachedSession(CACHE_NAME, expire_after=CACHE_EXPIRE_SECONDS)
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch_page(session, url, rate_limiter):
+    """
+    Fetches a single page while respecting the rate limit.
+    Each request takes a slot from the rate limiter, and the slot is only handed back
+    REQUEST_DELAY_SECONDS after the request, so at most MAX_WORKERS requests go out per delay window.
+    Pages served straight from the local cache never reach the server, so their slot is handed back at once.
+    Expired pages revalidated with the server are rate-limited like any other request.
+    """
+    rate_limiter.acquire()
+    response = None
+    try:
+        # A timeout is set to prevent the script from hanging indefinitely on a non-responsive server.
+        response = session.get(url, timeout=10)
+    finally:
+        if response is not None and response.from_cache and not response.revalidated:
+            rate_limiter.release()
+        else:
+            release_timer = threading.Timer(REQUEST_DELAY_SECONDS, rate_limiter.release)
+            release_timer.daemon = True
+            release_timer.start()
+
+    # This will raise an HTTPError if the HTTP request returned an unsuccessful status code (e.g., 404, 500).
+    response.raise_for_status()
+    return response
+
+
+def get_page_count(tree):
+    """
+    Reads the total number of catalogue pages from the pager text ("Page 1 of N").
+    Falls back to a single page if the pager is missing or unreadable.
+    """
+    current_page = tree.css_first('li.current')
+    if current_page:
+        try:
+            return int(current_page.text().split()[-1])
+        except (IndexError, ValueError):
+            pass
+    return 1
+
+
+def parse_books(tree, titles, prices, offset, block_size):
+    """
+    Extracts the title and price of every book on a parsed catalogue page.
+    The values are written straight into the page's block of block_size slots in the
+    preallocated titles/prices arrays, starting at the given offset. Books that don't fit
+    in the block are collected as (title, price) pairs instead, so nothing is lost.
+    Returns the number of books stored and the list of overflow books.
+    """
+    books_stored = 0
+    overflow = []
+
+    # Find all book entries on the page. Each book is contained in an <article> tag with the class 'product_pod'.
+    books_on_page = tree.css('article.product_pod')
+
+    # Loop through each book found on the page to extract its details.
+    for index, book in enumerate(books_on_page):
+        try:
+            # Extract the book title. The title is in an 'a' tag within the 'h3' tag.
+            # We access the 'title' attribute for the full title.
+            title = book.css_first('h3 a').attributes['title']
+            
+            # Extract the price. The price is in a <p> tag with the class 'price_color'.
+            # We get the text and strip the '£' symbol.
+            price_text = book.css_first('p.price_color').text()
+            price = float(price_text.strip('£'))
+
+            # Store the cleaned data in this book's slot, or set it aside if the block is full.
+            if index < block_size:
+                titles[offset + index] = title
+                prices[offset + index] = price
+            else:
+                overflow.append((title, price))
+            books_stored += 1
+
+        except (AttributeError, KeyError, ValueError) as e:
+            # Robustness: If a single book's HTML is malformed, log the error and continue
+            # with the next book instead of crashing the entire script.
+            logger.warning("Could not process a book entry. Error: %s. Skipping.", e)
+
+    return books_stored, overflow
+
+
+def scrape_page(session, page_number, rate_limiter, titles, prices, books_per_page):
+    """
+    Downloads and parses one catalogue page. Runs inside a worker thread.
+    Each page writes only to its own block of slots, so the workers never touch the same array entries.
+    Network errors are logged and the page is skipped, so one failure doesn't stop the other workers.
+    Returns the books that didn't fit in the page's block (see parse_books).
+    """
+    page_url = BASE_URL + f"page-{page_number}.html"
+    logger.info("Scraping page %d: %s", page_number, page_url)
+
+    try:
+        response = fetch_page(session, page_url, rate_limiter)
+    except requests.exceptions.RequestException as e:
+        logger.error("Network request failed for page %d: %s. Skipping.", page_number, e)
+        return []
+
+    # Parse the HTML content of the page using selectolax.
+    tree = LexborHTMLParser(response.content)
+    books_stored, overflow = parse_books(tree, titles, prices, offset=(page_number - 1) * books_per_page,
+                                         block_size=books_per_page)
+
+    if not books_stored:
+        logger.warning("No books found on page %d.", page_number)
+
+    return overflow
+
+
+def merge_overflow(titles, prices, page_overflows, books_per_page):
+    """
+    Rebuilds the titles/prices arrays when some pages listed more books than their block holds.
+    Each page's block is followed by that page's overflow books, so the catalogue order is kept.
+    """
+    title_parts = []
+    price_parts = []
+    for page_index, overflow in enumerate(page_overflows):
+        block = slice(page_index * books_per_page, (page_index + 1) * books_per_page)
+        title_parts += [titles[block], np.array([title for title, _ in overflow], dtype=object)]
+        price_parts += [prices[block], np.array([price for _, price in overflow], dtype=np.float32)]
+    return np.concatenate(title_parts), np.concatenate(price_parts)
+
+
 def scrape_books():
     """
     Main function to orchestrate the web scraping process.
-    It handles pagination, extracts book data, and saves it to a CSV.
+    It discovers the number of pages, fetches them concurrently, extracts book data, and saves it to a CSV.
     """
     print("--- Starting Web Scraper ---")
-    
-    # A list to hold the data for each book we find.
-    all_books_data = []
-    
-    # Keep track of the current page number for user feedback.
-    page_number = 1
-    
-    # The URL will be updated to point to the next page in each iteration.
-    next_page_url = CURRENT_URL
 
-    while next_page_url:
-        print(f"\n[INFO] Scraping page {page_number}: {next_page_url}")
+    # Ethical Best Practice: One shared limiter for all workers.
+    # Each request holds a slot for REQUEST_DELAY_SECONDS, keeping the overall request rate polite.
+    rate_limiter = threading.Semaphore(MAX_WORKERS)
 
-        try:
-            # Make the HTTP GET request to the current page.
-            # A timeout is set to prevent the script from hanging indefinitely on a non-responsive server.
-            response = requests.get(next_page_url, headers=HEADERS, timeout=10)
-            
-            # This will raise an HTTPError if the HTTP request returned an unsuccessful status code (e.g., 404, 500).
-            response.raise_for_status()
+    with create_session() as session:
+        # --- Pagination Discovery ---
 
+        # The first page is fetched on its own: it tells us how many pages the catalogue has.
+        print(f"\n[INFO] Scraping page 1: {CURRENT_URL}")
+        try:
+            response = fetch_page(session, CURRENT_URL, rate_limiter)
         except requests.exceptions.RequestException as e:
             print(f"[ERROR] Network request failed: {e}")
             print("[INFO] Stopping scraper due to network issues.")
-            break
-
-        # Parse the HTML content of the page using BeautifulSoup.
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Find all book entries on the page. Each book is contained in an <article> tag with the class 'product_pod'.
-        books_on_page = soup.find_all('article', class_='product_pod')
-
-        if not books_on_page:
-            print("[INFO] No books found on this page. This could be the end of the catalogue.")
-            break
-
-        # Loop through each book found on the page to extract its details.
-        for book in books_on_page:
-            try:
-                # Extract the book title. The title is in an 'a' tag within the 'h3' tag.
-                # We access the 'title' attribute for the full title.
-                title = book.h3.a['title']
-                
-                # Extract the price. The price is in a <p> tag with the class 'price_color'.
-                # We get the text and strip the '£' symbol.
-                price_text = book.find('p', class_='price_color').text
-                price = float(price_text.strip('£'))
-
-                # Store the cleaned data in a dictionary.
-                all_books_data.append({'title': title, 'price_in_pounds': price})
-
-            except (AttributeError, KeyError, ValueError) as e:
-                # Robustness: If a single book's HTML is malformed, log the error and continue
-                # with the next book instead of crashing the entire script.
-                print(f"[WARNING] Could not process a book entry. Error: {e}. Skipping.")
-
-        # --- Pagination Logic ---
-        
-        # Find the 'next' button to see if there's another page.
-        next_button = soup.find('li', class_='next')
-        
-        if next_button and next_button.a:
-            # If a 'next' button with a link is found, construct the URL for the next page.
-            next_page_relative_url = next_button.a['href']
-            next_page_url = BASE_URL + next_page_relative_url
-            page_number += 1
-        else:
-            # If no 'next' button is found, we've reached the last page.
-            print("\n[INFO] Reached the last page of the catalogue.")
-            next_page_url = None # This will cause the while loop to terminate.
+            return
+
+        tree = LexborHTMLParser(response.content)
+        total_pages = get_page_count(tree)
+
+        # Every full catalogue page lists the same number of books, so the first page tells us
+        # how many slots to reserve per page. A page that lists more keeps its extras aside.
+        books_per_page = len(tree.css('article.product_pod')) or 1
 
-        # Apply the ethical rate limit before making the next request.
-        print(f"[INFO] Waiting for {REQUEST_DELAY_SECONDS} second(s) before next request...")
-        time.sleep(REQUEST_DELAY_SECONDS)
+        # Performance: Preallocate one typed array per column instead of building a record per book.
+        # Slots start out empty (None / NaN); a slot that is never filled marks a skipped book.
+        expected_books = total_pages * books_per_page
+        titles = np.empty(expected_books, dtype=object)
+        prices = np.full(expected_books, np.nan, dtype=np.float32)
+
+        # The first page's block is sized from its own book count, so it never overflows.
+        parse_books(tree, titles, prices, offset=0, block_size=books_per_page)
+        page_overflows = [[]]
+
+        # --- Concurrent Fetching ---
+
+        if total_pages > 1:
+            print(f"\n[INFO] Found {total_pages} pages. Fetching the rest with {MAX_WORKERS} workers, "
+                  f"at most {MAX_WORKERS} request(s) every {REQUEST_DELAY_SECONDS} second(s)...")
+
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                # Each page fills its own slots, so the order in which pages finish doesn't matter.
+                # Consuming the results re-raises any unexpected error from a worker.
+                page_overflows += executor.map(
+                    lambda page_number: scrape_page(session, page_number, rate_limiter, titles, prices,
+                                                    books_per_page),
+                    range(2, total_pages + 1),
+                )
+
+        print("\n[INFO] Reached the last page of the catalogue.")
+
+    if any(page_overflows):
+        print(f"[INFO] Some pages listed more than {books_per_page} books. Adding the extra entries.")
+        titles, prices = merge_overflow(titles, prices, page_overflows, books_per_page)
 
     # --- Data Storage ---
 
-    if not all_books_data:
+    # Keep only the filled slots; skipped books and failed pages leave their price as NaN.
+    scraped = ~np.isnan(prices)
+    book_count = np.count_nonzero(scraped)
+
+    if not book_count:
         print("\n[INFO] No data was scraped. Exiting without creating a CSV file.")
         return
 
-    print(f"\n[SUCCESS] Scraped a total of {len(all_books_data)} books.")
-    print("[INFO] Converting data to pandas DataFrame and saving to CSV...")
+    print(f"\n[SUCCESS] Scraped a total of {book_count} books.")
+    print("[INFO] Converting data to an Arrow table and saving to CSV...")
 
-    # Convert the list of dictionaries into a pandas DataFrame.
-    # This structure is ideal for easy conversion to CSV and other formats.
-    df = pd.DataFrame(all_books_data)
+    # Build an Arrow table directly from the two column arrays.
+    # No pandas DataFrame is needed just to write a CSV.
+    table = pa.table({'title': titles[scraped], 'price_in_pounds': prices[scraped]})
     
-    # Save the DataFrame to a CSV file.
-    # index=False prevents pandas from writing row indices into the file.
+    # Save the table to a CSV file with pyarrow's fast C++ writer (always UTF-8).
     try:
-        df.to_csv('books.csv', index=False, encoding='utf-8')
+        pacsv.write_csv(table, 'books.csv')
         print("[SUCCESS] Data successfully saved to books.csv")
     except IOError as e:
         print(f"[ERROR] Could not write to CSV file: {e}")
@@ -150,4 +295,6 @@ def scrape_books():
 # This standard Python construct ensures that the scrape_books() function is called
 # only when the script is executed directly (e.g., `python web_scraper.py`).
 if __name__ == "__main__":
+    # Log records use the same "[LEVEL] message" layout as the rest of the output, on the same stream.
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s', stream=sys.stdout)
     scrape_books()
@@ -8,6 +8,7 @@
 #
 # Skills Showcased:
 # - Data loading from a URL.
+# - Memory optimization by downcasting column types.
 # - Exploratory data analysis with .info() and .isnull().
 # - Handling missing values (imputation and dropping columns).
 # - Feature engineering to create new, valuable columns.
@@ -16,6 +17,56 @@
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+def reduce_mem_usage(df):
+    """
+    Shrinks a DataFrame's memory footprint by downcasting its column types.
+
+    Integer columns get the smallest (unsigned when possible) integer type that holds
+    their values, float columns become float32, and low-cardinality text columns
+    become categories.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to shrink.
+
+    Returns:
+        pd.DataFrame: The same DataFrame with compact column types.
+    """
+    start_mem = df.memory_usage(deep=True).sum() / 1024**2
+
+    for col in df.columns:
+        col_type = df[col].dtype
+
+        if pd.api.types.is_bool_dtype(col_type):
+            continue
+
+        if pd.api.types.is_integer_dtype(col_type):
+            # Nullable integers can't be cast to plain NumPy integers, so leave them as they are.
+            if df[col].isna().any():
+                continue
+            c_min, c_max = df[col].min(), df[col].max()
+            candidates = [np.uint8, np.uint16, np.uint32] if c_min >= 0 else [np.int8, np.int16, np.int32]
+            for candidate in candidates:
+                if np.iinfo(candidate).min <= c_min and c_max <= np.iinfo(candidate).max:
+                    df[col] = df[col].astype(candidate)
+                    break
+
+        elif pd.api.types.is_float_dtype(col_type):
+            # float16 is skipped on purpose: it loses too much precision for values like fares.
+            df[col] = df[col].astype(np.float32)
+
+        elif pd.api.types.is_string_dtype(col_type) or col_type == object:
+            # Only repeat-heavy columns benefit; a category of unique names would cost more memory.
+            if df[col].nunique() < 0.5 * len(df):
+                df[col] = df[col].astype('category')
+
+    end_mem = df.memory_usage(deep=True).sum() / 1024**2
+    print(f"[OPTIMIZE] Memory usage reduced from {start_mem:.2f} MB to {end_mem:.2f} MB "
+          f"({100 * (start_mem - end_mem) / start_mem:.1f}% smaller).")
+    return df
 
 def clean_titanic_dataset(url, output_filename):
     """
@@ -30,7 +81,8 @@ def clean_titanic_dataset(url, output_filename):
     # --- 1. Load Data ---
     try:
         print(f"\n[INFO] Loading dataset from URL: {url}")
-        df = pd.read_csv(url)
+        # The pyarrow engine parses in parallel and keeps columns Arrow-backed, using less memory.
+        df = pd.read_csv(url, engine='pyarrow', dtype_backend='pyarrow')
     except Exception as e:
         print(f"[ERROR] Failed to load data from URL. Reason: {e}")
         return
@@ -42,48 +94,52 @@ def clean_titanic_dataset(url, output_filename):
     # .info() gives a great overview of data types and non-null counts.
     df.info()
 
+    # Downcast the default 64-bit and text columns so every later step touches less memory.
+    # This runs after the initial analysis so the raw values and dtypes are shown as loaded.
+    df = reduce_mem_usage(df)
+
     # --- 3. Handle Missing Values ---
     print("\n--- 3. Handling Missing Values ---")
 
     # Strategy 1: Impute 'Age'.
     # The median is often better than the mean here as it's less sensitive to outliers.
-    median_age = df['Age'].median()
-    df['Age'] = df['Age'].fillna(median_age)
-    print(f"[FIX] Missing 'Age' values filled with median age: {median_age:.2f}")
-
     # Strategy 2: Impute 'Embarked'.
     # We'll fill the few missing values with the most common port of embarkation (the mode).
-    mode_embarked = df['Embarked'].mode()[0]
-    df['Embarked'] = df['Embarked'].fillna(mode_embarked)
-    print(f"[FIX] Missing 'Embarked' values filled with mode: {mode_embarked}")
-
-    # Strategy 3: Drop 'Cabin' column.
-    # The 'Cabin' column has too many missing values to be useful.
-    df.drop('Cabin', axis=1, inplace=True)
-    print("[FIX] 'Cabin' column dropped due to excessive missing values.")
+    # Both fill values are computed first and applied in a single fillna call.
+    fill_values = {'Age': df['Age'].median(), 'Embarked': df['Embarked'].mode().iat[0]}
+    df.fillna(fill_values, inplace=True)
+    print(f"[FIX] Missing 'Age' values filled with median age: {fill_values['Age']:.2f}")
+    print(f"[FIX] Missing 'Embarked' values filled with mode: {fill_values['Embarked']}")
 
     # --- 4. Feature Engineering ---
     print("\n--- 4. Feature Engineering ---")
 
     # We can extract titles (Mr, Mrs, Miss, etc.) from the 'Name' column.
-    df['Title'] = df['Name'].str.extract(r' ([A-Za-z]+)\.', expand=False)
+    # pyarrow's extract_regex runs RE2 in C over the whole Arrow column, with linear-time matching.
+    names = pa.array(df['Name'], type=pa.string())
+    titles = pc.extract_regex(names, pattern=r' (?P<Title>[A-Za-z]+)\.')
+    df['Title'] = titles.field('Title').to_pandas()
     # Consolidate rare titles into a single 'Other' category.
     common_titles = ['Mr', 'Miss', 'Mrs', 'Master']
-    df['Title'] = df['Title'].replace([title for title in df['Title'].unique() if title not in common_titles], 'Other')
+    # A single isin() mask keeps the common titles; storing them as a category saves memory.
+    df['Title'] = df['Title'].where(df['Title'].isin(common_titles), 'Other').astype('category')
     print("[CREATE] 'Title' column created by extracting from 'Name'.")
 
-    # Drop columns that are no longer needed after engineering.
-    df.drop(['Name', 'Ticket', 'PassengerId'], axis=1, inplace=True)
-    print("[CLEAN] Dropped 'Name', 'Ticket', and 'PassengerId' columns.")
+    # Drop columns that are no longer needed after engineering in a single call.
+    # 'Cabin' goes too, since it has too many missing values to be useful.
+    df.drop(columns=['Cabin', 'Name', 'Ticket', 'PassengerId'], inplace=True)
+    print("[CLEAN] Dropped 'Cabin', 'Name', 'Ticket', and 'PassengerId' columns.")
 
     # --- 5. Convert Categorical Data to Numerical ---
     print("\n--- 5. Converting Categorical Features to Numbers ---")
 
     # Models need numbers, not text. We'll convert 'Sex', 'Embarked', and 'Title'.
-    df['Sex'] = df['Sex'].map({'male': 0, 'female': 1}).astype(int)
+    # A single vectorized comparison encodes 'female' as 1 and 'male' as 0, using 1 byte per row.
+    df['Sex'] = np.where(df['Sex'].to_numpy() == 'female', 1, 0).astype(np.int8)
     
     # get_dummies creates new columns for each category (one-hot encoding).
-    df = pd.get_dummies(df, columns=['Embarked', 'Title'], drop_first=True)
+    # The columns are mostly zeros, so they are stored sparse as int8 (0/1) to save memory.
+    df = pd.get_dummies(df, columns=['Embarked', 'Title'], drop_first=True, sparse=True, dtype=np.int8)
     print("[CONVERT] Converted 'Sex', 'Embarked', and 'Title' to numerical format.")
 
     # --- 6. Final Data Analysis (After Cleaning) ---
@@ -91,11 +147,19 @@ def clean_titanic_dataset(url, output_filename):
     print("First 5 rows of the cleaned dataset:")
     print(df.head())
     print("\nSummary of the cleaned dataset (no missing values):")
-    df.info()
+    # Frame-wide non-null counts don't work with the sparse one-hot columns, so missing values
+    # are counted column by column instead.
+    df.info(show_counts=False)
+    missing_values = sum(df[col].isna().sum() for col in df.columns)
+    print(f"Total missing values: {missing_values}")
 
     # --- 7. Save Cleaned Data ---
+    # pyarrow's C++ CSV writer is much faster than DataFrame.to_csv. Arrow has no sparse
+    # columns, so the one-hot columns are densified only for the conversion.
+    sparse_columns = {col: dtype.subtype for col, dtype in df.dtypes.items() if isinstance(dtype, pd.SparseDtype)}
+    table = pa.Table.from_pandas(df.astype(sparse_columns), preserve_index=False)
     try:
-        df.to_csv(output_filename, index=False)
+        pacsv.write_csv(table, output_filename)
         print(f"\n[SUCCESS] Cleaned dataset saved to {output_filename}")
     except IOError as e:
         print(f"\n[ERROR] Could not save the file. Reason: {e}")